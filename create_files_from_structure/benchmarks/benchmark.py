@@ -0,0 +1,415 @@
+"""
+create_files_from_structure 基准测试
+
+生成可复现的合成结构，调用真实的 build_archive / patch_archive，按阶段记录耗时、峰值内存和输出大小，
+结果写入 JSON 文件；指定 --compare 时与保存的基线比较，出现性能回退时以非零状态码退出
+
+用法：
+    python benchmarks/benchmark.py --output results.json
+    python benchmarks/benchmark.py --compare baseline.json --tolerance 0.2
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tarfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.create_files_from_structure import (  # noqa: E402
+    PARALLEL_THRESHOLD, CompressionCache, build_archive, build_batch, patch_archive,
+)
+
+WORDS = [
+    "def", "return", "self", "value", "import", "class", "for", "in", "range", "if", "else",
+    "print", "data", "result", "None", "True", "False", "while", "try", "except", "with", "as",
+]
+CJK_WORDS = ["数据", "结果", "文件", "目录", "压缩", "配置", "用户", "界面", "测试", "函数"]
+
+
+def _code(rng: random.Random, size: int, words: list = WORDS) -> str:
+    """
+    生成近似源代码的文本
+    """
+    lines = []
+    length = 0
+    while length < size:
+        indent = "    " * rng.randint(0, 3)
+        line = indent + " ".join(rng.choice(words) for _ in range(rng.randint(2, 10)))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)[:size]
+
+
+def _structure(files: dict, file_structure: list | None = None) -> str:
+    return json.dumps({
+        "file_structure": file_structure if file_structure is not None else list(files),
+        "files": [{"filename": name, "content": content} for name, content in files.items()],
+    }, ensure_ascii=False)
+
+
+def tiny_files(rng: random.Random, scale: float) -> dict:
+    count = int(5000 * scale)
+    return {f"src/pkg{i % 50}/mod_{i}.py": _code(rng, rng.randint(20, 300)) for i in range(count)}
+
+
+def huge_files(rng: random.Random, scale: float) -> dict:
+    size = int(16 * 1024 * 1024 * scale)
+    return {f"data/blob_{i}.sql": _code(rng, size) for i in range(3)}
+
+
+def deep_nesting(rng: random.Random, scale: float) -> dict:
+    files = {}
+    for branch in range(int(50 * scale) or 1):
+        path = "/".join(f"level{depth}_{branch % (depth + 2)}" for depth in range(40))
+        for i in range(5):
+            files[f"{path}/file_{branch}_{i}.txt"] = _code(rng, 2000)
+    return files
+
+
+def non_ascii(rng: random.Random, scale: float) -> dict:
+    count = int(1000 * scale)
+    return {
+        f"文档/{rng.choice(CJK_WORDS)}_{i}/说明_{i}.md": _code(rng, rng.randint(500, 8000), CJK_WORDS + WORDS)
+        for i in range(count)
+    }
+
+
+def duplicate_content(rng: random.Random, scale: float) -> dict:
+    templates = [_code(rng, 20000) for _ in range(5)]
+    return {f"copies/{i}/LICENSE.txt": templates[i % len(templates)] for i in range(int(2000 * scale))}
+
+
+SCENARIOS = {
+    "tiny_files": tiny_files,
+    "huge_files": huge_files,
+    "deep_nesting": deep_nesting,
+    "non_ascii": non_ascii,
+    "duplicate_content": duplicate_content,
+}
+
+# 清单规模扩展测试：耗时应随条目数线性增长
+SCALING_SIZES = [10, 100, 1000, 10000, 50000]
+
+# 并行压缩测试使用的线程数
+WORKER_COUNTS = [1, 2, 4, 8]
+
+# 批量测试中的结构数量
+BATCH_SIZE = 8
+
+
+def _measure(func, repeat: int, memory: bool):
+    """
+    执行一个阶段：取多次运行中的最短耗时；memory 为 True 时再单独运行一次记录 tracemalloc 峰值
+
+    Returns:
+        tuple: (最后一次运行的返回值, 阶段指标)
+    """
+    best = None
+    value = None
+    for _ in range(repeat):
+        if value is not None:
+            _close(value)
+        start = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    metrics = {"time_s": round(best, 6)}
+    if memory:
+        _close(value)
+        tracemalloc.start()
+        value = func()
+        metrics["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return value, metrics
+
+
+def _close(value) -> None:
+    if isinstance(value, dict) and "file" in value:
+        value["file"]["output"].close()
+
+
+def _build(structure: str, args, workers: int | None = None, parallel_threshold: int | None = None):
+    def run():
+        result = build_archive(
+            structure,
+            workers=workers if workers is not None else args.workers,
+            parallel_threshold=parallel_threshold if parallel_threshold is not None else PARALLEL_THRESHOLD,
+            cache=CompressionCache(),
+            compression=args.compression,
+            archive_format=args.format,
+        )
+        if "error" in result:
+            raise RuntimeError(f"{result['error']}: {result['details']}")
+        return result
+    return run
+
+
+def _read_back(data: bytes, archive_format: str) -> int:
+    """
+    读回压缩包校验内容，返回文件数
+    """
+    if archive_format != "zip":
+        count = 0
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar_file:
+            for member in tar_file:
+                if member.isfile():
+                    tar_file.extractfile(member).read()
+                    count += 1
+        return count
+    with zipfile.ZipFile(io.BytesIO(data)) as zip_file:
+        bad = zip_file.testzip()
+        if bad is not None:
+            raise RuntimeError(f"Corrupt entry {bad!r}")
+        return sum(1 for info in zip_file.infolist() if not info.is_dir())
+
+
+def run_scenario(name: str, files: dict, args, **build_options) -> dict:
+    """
+    按阶段运行一个场景：generate（序列化结构）、build（构建压缩包）、finalize（取出压缩包数据）、verify（读回校验），
+    build_metrics 为最后一次构建时工具自身记录的分阶段统计
+    """
+    phases = {}
+    structure, phases["generate"] = _measure(lambda: _structure(files), 1, args.memory)
+    result, phases["build"] = _measure(_build(structure, args, **build_options), args.repeat, args.memory)
+    data, phases["finalize"] = _measure(result["file"]["output"].getvalue, 1, False)
+    count, phases["verify"] = _measure(lambda: _read_back(data, args.format), 1, False)
+    result["file"]["output"].close()
+
+    input_bytes = len(structure.encode("utf-8"))
+    return {
+        "files": count,
+        "input_bytes": input_bytes,
+        "output_bytes": len(data),
+        "ratio": round(len(data) / input_bytes, 4) if input_bytes else 0,
+        "phases": phases,
+        "build_metrics": result["metrics"].to_dict(),
+    }
+
+
+def run_patch(rng: random.Random, args) -> dict:
+    """
+    增量更新场景：修改少量文件后分别全量重建和增量更新，校验两者内容一致
+    """
+    files = tiny_files(rng, args.scale)
+    previous = build_archive(_structure(files), cache=CompressionCache(0))
+    previous_data = previous["file"]["output"].getvalue()
+    previous["file"]["output"].close()
+
+    names = sorted(files)
+    changed = {name: _code(rng, 500) for name in rng.sample(names, 20)}
+    deleted = rng.sample([name for name in names if name not in changed], 20)
+    delta = json.dumps({
+        "files": [{"filename": name, "content": content} for name, content in changed.items()],
+        "deleted": deleted,
+    }, ensure_ascii=False)
+
+    final = {**files, **changed}
+    for name in deleted:
+        del final[name]
+
+    phases = {}
+    rebuilt, phases["rebuild"] = _measure(
+        lambda: build_archive(_structure(final), cache=CompressionCache(0), workers=1), args.repeat, args.memory)
+    patched, phases["patch"] = _measure(
+        lambda: patch_archive(previous_data, delta, cache=CompressionCache(0), workers=1), args.repeat, args.memory)
+    if "error" in patched:
+        raise RuntimeError(f"{patched['error']}: {patched['details']}")
+
+    with zipfile.ZipFile(io.BytesIO(rebuilt["file"]["output"].getvalue())) as expected, \
+            zipfile.ZipFile(io.BytesIO(patched["file"]["output"].getvalue())) as actual:
+        if sorted(expected.namelist()) != sorted(actual.namelist()):
+            raise RuntimeError("Patched archive entries differ from a full rebuild")
+        for name in expected.namelist():
+            if expected.read(name) != actual.read(name):
+                raise RuntimeError(f"Patched content of {name!r} differs from a full rebuild")
+        output_bytes = patched["file"]["output"].size
+    rebuilt["file"]["output"].close()
+    patched["file"]["output"].close()
+
+    return {
+        "files": len(final),
+        "input_bytes": len(delta.encode("utf-8")),
+        "output_bytes": output_bytes,
+        "phases": phases,
+        "build_metrics": patched["metrics"].to_dict(),
+    }
+
+
+def run_batch(rng: random.Random, args) -> dict:
+    """
+    批量场景：同一批结构逐个调用 build_archive（serial），与 build_batch 的并发构建（separate）、合并构建（combined）对比
+    """
+    structures = [
+        {"name": f"project_{index}", "files": [{"filename": name, "content": content} for name, content in files.items()]}
+        for index, files in enumerate(tiny_files(rng, args.scale / 10) for _ in range(BATCH_SIZE))
+    ]
+    batch = json.dumps(structures, ensure_ascii=False)
+    items = [json.dumps(structure, ensure_ascii=False) for structure in structures]
+
+    def serial():
+        return [build_archive(item, workers=1, cache=CompressionCache(0)) for item in items]
+
+    def batched(batch_output: str):
+        return lambda: build_batch(batch, batch_output=batch_output, workers=args.workers, cache=CompressionCache(0))
+
+    phases = {}
+    serial_results, phases["serial"] = _measure(serial, args.repeat, args.memory)
+    separate, phases["separate"] = _measure(batched("separate"), args.repeat, args.memory)
+    combined, phases["combined"] = _measure(batched("combined"), args.repeat, args.memory)
+    if "error" in combined or any("error" in item for item in separate["items"]):
+        raise RuntimeError("Batch build failed")
+    output_bytes = combined["file"]["output"].size
+    for result in [*serial_results, *separate["items"], combined]:
+        result["file"]["output"].close()
+
+    return {
+        "files": combined["result"]["total_files"],
+        "input_bytes": len(batch.encode("utf-8")),
+        "output_bytes": output_bytes,
+        "phases": phases,
+    }
+
+
+def run_all(args) -> dict:
+    results = {}
+    selected = set(args.scenario or [])
+
+    def wanted(name: str) -> bool:
+        return not selected or name in selected
+
+    for name, generator in SCENARIOS.items():
+        if wanted(name):
+            print(f"running {name} ...", file=sys.stderr)
+            results[name] = run_scenario(name, generator(random.Random(args.seed), args.scale), args)
+
+    if wanted("scaling"):
+        for size in SCALING_SIZES:
+            print(f"running scaling_{size} ...", file=sys.stderr)
+            rng = random.Random(args.seed)
+            files = {f"pkg{i % 100}/mod_{i}.py": _code(rng, 64) for i in range(size)}
+            results[f"scaling_{size}"] = run_scenario(f"scaling_{size}", files, args, workers=1)
+            build = results[f"scaling_{size}"]["phases"]["build"]
+            build["us_per_entry"] = round(build["time_s"] / size * 1e6, 3)
+
+    if wanted("parallel"):
+        files = huge_files(random.Random(args.seed), args.scale / 4)
+        for workers in WORKER_COUNTS:
+            print(f"running parallel_w{workers} ...", file=sys.stderr)
+            results[f"parallel_w{workers}"] = run_scenario(
+                f"parallel_w{workers}", files, args, workers=workers, parallel_threshold=0)
+
+    if wanted("patch"):
+        print("running patch ...", file=sys.stderr)
+        results["patch"] = run_patch(random.Random(args.seed), args)
+
+    if wanted("batch"):
+        print("running batch ...", file=sys.stderr)
+        results["batch"] = run_batch(random.Random(args.seed), args)
+
+    return results
+
+
+# 基线与本次运行必须一致的参数，否则结果不可比较
+COMPARABLE_META = ("seed", "scale", "repeat", "workers", "compression", "format")
+
+
+def meta_mismatches(meta: dict, baseline: dict) -> list:
+    """
+    返回基线与本次运行不一致的参数
+    """
+    previous = baseline.get("meta", {})
+    return [f"{key}: baseline {previous.get(key)!r}, current {meta[key]!r}"
+            for key in COMPARABLE_META if previous.get(key) != meta[key]]
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_time: float) -> list:
+    """
+    与基线比较，返回回退项列表：耗时或峰值内存超出基线 tolerance 比例，或输出变大超过 1%；
+    耗时的绝对差值小于 min_time 时视为噪声
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        if current["output_bytes"] > previous["output_bytes"] * 1.01:
+            regressions.append(f"{name}: output_bytes {previous['output_bytes']} -> {current['output_bytes']}")
+        for phase, metrics in current["phases"].items():
+            old = previous["phases"].get(phase, {})
+            for key in ("time_s", "peak_bytes"):
+                if key not in metrics or not old.get(key) or metrics[key] <= old[key] * (1 + tolerance):
+                    continue
+                if key == "time_s" and metrics[key] - old[key] < min_time:
+                    continue
+                regressions.append(f"{name}.{phase}: {key} {old[key]} -> {metrics[key]}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark create_files_from_structure")
+    parser.add_argument("--scenario", action="append",
+                        help=f"scenario to run (repeatable): {', '.join([*SCENARIOS, 'scaling', 'parallel', 'patch', 'batch'])}")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for scenario sizes")
+    parser.add_argument("--seed", type=int, default=20260101)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per phase, the fastest is kept")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--compression", default="balanced")
+    parser.add_argument("--format", default="zip")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc run")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown / memory growth")
+    parser.add_argument("--min-time", type=float, default=0.005, help="ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args()
+
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "scale": args.scale,
+        "repeat": args.repeat,
+        "workers": args.workers,
+        "compression": args.compression,
+        "format": args.format,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    baseline = None
+    if args.compare:
+        # 参数不同的基线会产生虚假的回退或掩盖真实的回退，在运行前拒绝比较
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        mismatches = meta_mismatches(meta, baseline)
+        for line in mismatches:
+            print(f"BASELINE MISMATCH {line}", file=sys.stderr)
+        if mismatches:
+            return 2
+
+    report = {"meta": meta, "scenarios": run_all(args)}
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+
+    if baseline is not None:
+        regressions = compare(report["scenarios"], baseline, args.tolerance, args.min_time)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("no regressions", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 与 benchmarks/benchmark.py 相同，以插件目录为根导入 tools 包
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
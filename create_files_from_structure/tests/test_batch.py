@@ -0,0 +1,113 @@
+"""
+批量模式测试：错误按结构隔离，separate 模式逐个产出结果，同时构建的结构数量与输入长度有上限
+"""
+import io
+import json
+import zipfile
+
+import tools.create_files_from_structure as module
+from tools.create_files_from_structure import CompressionCache, build_batch, iter_batch
+
+
+def _project(count: int, **extra) -> dict:
+    return {"files": [{"filename": f"src/m{i}.py", "content": f"print({i})\n" * 20} for i in range(count)], **extra}
+
+
+def test_errors_are_isolated_per_structure():
+    structures = json.dumps([
+        _project(2, name="alpha"),
+        {"files": [{"filename": "../escape"}]},
+        "not an object",
+        _project(1, name="alpha"),
+        _project(3),
+    ])
+    results = list(iter_batch(structures, workers=2, cache=CompressionCache(0)))
+    try:
+        assert [result["name"] for result in results] == ["alpha", "structure_2", "structure_3", "structure_4", "structure_5"]
+        assert [("error" in result) for result in results] == [False, True, True, True, False]
+        with zipfile.ZipFile(io.BytesIO(results[4]["file"]["output"].getvalue())) as zip_file:
+            assert sorted(zip_file.namelist()) == ["src/", "src/m0.py", "src/m1.py", "src/m2.py"]
+    finally:
+        for result in results:
+            if "file" in result:
+                result["file"]["output"].close()
+
+
+def test_combined_archive_skips_failed_structures():
+    structures = json.dumps([_project(2, name="a"), {"files": [{"filename": "x", "content": 1}]}, _project(1, name="b")])
+    result = build_batch(structures, "combined", cache=CompressionCache(0))
+    try:
+        assert [("error" in item) for item in result["result"]["items"]] == [False, True, False]
+        with zipfile.ZipFile(io.BytesIO(result["file"]["output"].getvalue())) as zip_file:
+            assert sorted(zip_file.namelist()) == ["a/", "a/src/", "a/src/m0.py", "a/src/m1.py", "b/", "b/src/", "b/src/m0.py"]
+    finally:
+        result["file"]["output"].close()
+
+
+def _max_live_archives(monkeypatch, structures: str, workers: int) -> int:
+    """
+    逐个取走并关闭 iter_batch 的结果，返回同一时刻持有的压缩包数量的最大值
+    """
+    live = {"current": 0, "max": 0}
+    build_archive = module.build_archive
+
+    def tracked_build_archive(*args, **kwargs):
+        result = build_archive(*args, **kwargs)
+        output = result["file"]["output"]
+        close = output.close
+        live["current"] += 1
+        live["max"] = max(live["max"], live["current"])
+
+        def tracked_close():
+            live["current"] -= 1
+            close()
+
+        output.close = tracked_close
+        return result
+
+    monkeypatch.setattr(module, "build_archive", tracked_build_archive)
+    names = []
+    for result in iter_batch(structures, workers=workers, cache=CompressionCache(0)):
+        names.append(result["name"])
+        # 模拟输出压缩包后立即关闭
+        result["file"]["output"].close()
+
+    assert names == [f"structure_{index}" for index in range(1, len(names) + 1)]
+    assert live["current"] == 0
+    return live["max"]
+
+
+def test_separate_mode_bounds_open_archives(monkeypatch):
+    structures = json.dumps([_project(2) for _ in range(8)])
+
+    assert _max_live_archives(monkeypatch, structures, workers=2) <= 2
+
+
+def test_separate_mode_caps_workers(monkeypatch):
+    structures = json.dumps([_project(2) for _ in range(8)])
+
+    assert _max_live_archives(monkeypatch, structures, workers=64) <= module.BATCH_MAX_WORKERS
+
+
+def test_separate_mode_bounds_in_flight_bytes(monkeypatch):
+    # 每个结构都超过上限时逐个构建，与 workers=1 相同
+    monkeypatch.setattr(module, "BATCH_WINDOW_BYTES", 1)
+    structures = json.dumps([_project(2) for _ in range(8)])
+
+    assert _max_live_archives(monkeypatch, structures, workers=2) == 1
+
+
+def test_nested_names_are_duplicates():
+    structures = json.dumps([
+        _project(1, name="a/b"),
+        _project(1, name="a"),
+        _project(1, name="a/b/c"),
+        _project(1, name="ab"),
+        _project(1, name="a/bc"),
+    ])
+    results = list(iter_batch(structures, workers=1, cache=CompressionCache(0)))
+    for result in results:
+        if "file" in result:
+            result["file"]["output"].close()
+
+    assert [("error" in result) for result in results] == [False, True, True, False, False]
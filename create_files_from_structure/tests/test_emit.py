@@ -0,0 +1,22 @@
+"""
+结果输出测试：输出过程中出错时压缩包同样会被关闭
+"""
+import json
+
+import pytest
+
+import tools.create_files_from_structure as module
+from tools.create_files_from_structure import CompressionCache, CreateFilesFromStructureTool, build_archive
+
+
+def test_output_is_closed_when_summary_fails(monkeypatch):
+    def broken_summary(result, detail):
+        raise RuntimeError("summary failed")
+
+    monkeypatch.setattr(module, "summarize_result", broken_summary)
+    result = build_archive(json.dumps({"files": [{"filename": "a.txt", "content": "a"}]}), cache=CompressionCache(0))
+    tool = object.__new__(CreateFilesFromStructureTool)
+
+    with pytest.raises(RuntimeError):
+        list(tool._emit_result(result, "summary"))
+    assert result["file"]["output"].file.closed
@@ -0,0 +1,35 @@
+"""
+FileManifest.from_structure 的规模扩展测试：建立清单的耗时应随条目数线性增长
+"""
+import time
+
+from tools.create_files_from_structure import FileManifest
+
+SIZES = [1000, 10000, 50000]
+
+# 50k 条目的单条耗时相对 1k 条目允许的最大倍数；二次复杂度时该倍数约为 50
+MAX_PER_ENTRY_RATIO = 3.0
+
+
+def _structure(size: int) -> dict:
+    return {
+        "files": [{"filename": f"pkg{i % 100}/sub{i % 7}/mod_{i}.py", "content": "x"} for i in range(size)],
+        "file_structure": [f"pkg{i % 100}/sub{i % 7}/mod_{i}.py" for i in range(0, size, 2)] + ["docs/"],
+    }
+
+
+def _per_entry_seconds(size: int, repeat: int = 3) -> float:
+    structure = _structure(size)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        manifest = FileManifest.from_structure(structure)
+        best = min(best, time.perf_counter() - start)
+    assert manifest.file_count == size
+    return best / size
+
+
+def test_from_structure_scales_linearly():
+    per_entry = {size: _per_entry_seconds(size) for size in SIZES}
+    ratio = per_entry[SIZES[-1]] / per_entry[SIZES[0]]
+    assert ratio < MAX_PER_ENTRY_RATIO, per_entry
@@ -0,0 +1,32 @@
+"""
+并行压缩测试：线程数配置与出错时等待中的压缩任务的处理
+"""
+import io
+
+import pytest
+
+from tools.create_files_from_structure import CompressionCache, FileManifest, ZipArchiveWriter, _env_int
+
+
+@pytest.mark.parametrize("value, expected", [(None, 7), ("", 7), ("3", 3), ("0", 7), ("-2", 7), ("many", 7)])
+def test_env_int(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("CREATE_FILES_TEST_WORKERS", raising=False)
+    else:
+        monkeypatch.setenv("CREATE_FILES_TEST_WORKERS", value)
+
+    assert _env_int("CREATE_FILES_TEST_WORKERS", 7) == expected
+
+
+def test_writer_drains_pending_jobs_on_error():
+    manifest = FileManifest.from_structure({
+        "files": [{"filename": f"f{i}.txt", "content": f"{i}" * 100_000} for i in range(16)],
+    })
+    writer = ZipArchiveWriter(io.BytesIO(), 4, CompressionCache(0), 6)
+    with pytest.raises(RuntimeError):
+        with writer:
+            writer.write_entries(manifest, list(manifest.entries))
+            assert writer._pending
+            raise RuntimeError("abort")
+
+    assert not writer._pending
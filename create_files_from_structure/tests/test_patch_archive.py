@@ -0,0 +1,146 @@
+"""
+patch_archive 的正确性测试：增量更新的结果应与对最终目录树全量构建的结果一致
+"""
+import io
+import json
+import zipfile
+
+import pytest
+
+import tools.create_files_from_structure as module
+from tools.create_files_from_structure import CompressionCache, build_archive, patch_archive
+
+BASE_FILES = {
+    "README.md": "# demo\n",
+    "src/a.py": "print('a')\n" * 20,
+    "src/b.py": "print('b')\n" * 20,
+    "src/util/c.py": "print('c')\n" * 20,
+    "docs/guide.md": "guide\n" * 50,
+}
+
+
+def _structure(files: dict, **extra) -> str:
+    return json.dumps({"files": [{"filename": name, "content": content} for name, content in files.items()], **extra})
+
+
+def _archive_bytes(result: dict) -> bytes:
+    assert "error" not in result, result
+    output = result["file"]["output"]
+    try:
+        return output.getvalue()
+    finally:
+        output.close()
+
+
+def _build(files: dict) -> bytes:
+    return _archive_bytes(build_archive(_structure(files), cache=CompressionCache(0)))
+
+
+def _patch(previous: bytes, delta: str) -> dict:
+    return patch_archive(previous, delta, workers=1, cache=CompressionCache(0))
+
+
+def _assert_same_tree(patched: bytes, expected: bytes) -> None:
+    """
+    比较条目名称、内容与 CRC
+    """
+    with zipfile.ZipFile(io.BytesIO(patched)) as actual, zipfile.ZipFile(io.BytesIO(expected)) as wanted:
+        assert actual.testzip() is None
+        assert sorted(actual.namelist()) == sorted(wanted.namelist())
+        for info in wanted.infolist():
+            other = actual.getinfo(info.filename)
+            assert other.CRC == info.CRC, info.filename
+            assert actual.read(info.filename) == wanted.read(info.filename), info.filename
+
+
+def test_delete_whole_directory():
+    final = {name: content for name, content in BASE_FILES.items() if not name.startswith("src/")}
+    result = _patch(_build(BASE_FILES), _structure({}, deleted=["src"]))
+
+    assert sorted(result["result"]["deleted"]) == ["src/a.py", "src/b.py", "src/util/c.py"]
+    _assert_same_tree(_archive_bytes(result), _build(final))
+
+
+def test_delete_and_readd_same_path_is_modified():
+    final = {**BASE_FILES, "src/a.py": "print('new a')\n"}
+    result = _patch(_build(BASE_FILES), _structure({"src/a.py": final["src/a.py"]}, deleted=["src/a.py"]))
+
+    assert result["result"]["modified"] == ["src/a.py"]
+    assert result["result"]["added"] == []
+    assert result["result"]["deleted"] == []
+    _assert_same_tree(_archive_bytes(result), _build(final))
+
+
+def test_readd_file_inside_deleted_directory():
+    final = {**{name: content for name, content in BASE_FILES.items() if not name.startswith("src/")}, "src/b.py": "b2\n"}
+    result = _patch(_build(BASE_FILES), _structure({"src/b.py": "b2\n"}, deleted=["src"]))
+
+    assert result["result"]["modified"] == ["src/b.py"]
+    assert sorted(result["result"]["deleted"]) == ["src/a.py", "src/util/c.py"]
+    _assert_same_tree(_archive_bytes(result), _build(final))
+
+
+def test_file_replaced_by_directory():
+    final = {**{name: content for name, content in BASE_FILES.items() if name != "src/a.py"}, "src/a.py/x": "x\n"}
+    result = _patch(_build(BASE_FILES), _structure({"src/a.py/x": "x\n"}, deleted=["src/a.py"]))
+
+    assert result["result"]["added"] == ["src/a.py/x"]
+    assert result["result"]["deleted"] == ["src/a.py"]
+    _assert_same_tree(_archive_bytes(result), _build(final))
+
+
+def test_file_replaced_by_directory_without_delete_is_rejected():
+    result = _patch(_build(BASE_FILES), _structure({"src/a.py/x": "x\n"}))
+
+    assert result["error"] == "Failed to patch archive"
+
+
+class _Unseekable(io.RawIOBase):
+    """
+    不可 seek 的输出流，zipfile 写入时会改用数据描述符（data descriptor）记录 CRC 与大小
+    """
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return self.buffer.write(data)
+
+
+def test_previous_archive_with_data_descriptors():
+    stream = _Unseekable()
+    with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for name, content in BASE_FILES.items():
+            zip_file.writestr(name, content)
+    previous = stream.buffer.getvalue()
+    with zipfile.ZipFile(io.BytesIO(previous)) as zip_file:
+        assert all(info.flag_bits & 0x08 for info in zip_file.infolist())
+
+    final = {**BASE_FILES, "src/b.py": "b2\n", "new.txt": "new\n"}
+    result = _patch(previous, _structure({"src/b.py": "b2\n", "new.txt": "new\n"}))
+
+    assert result["result"]["modified"] == ["src/b.py"]
+    assert result["result"]["added"] == ["new.txt"]
+    _assert_same_tree(_archive_bytes(result), _build(final))
+
+
+@pytest.mark.parametrize("delta", [_structure({"new.txt": "new\n"}), _structure({"src/a.py/x": "x\n"})])
+def test_previous_archive_is_closed(monkeypatch, delta):
+    opened = []
+
+    class TrackedZipFile(zipfile.ZipFile):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            opened.append(self)
+
+    previous = _build(BASE_FILES)
+    monkeypatch.setattr(module.zipfile, "ZipFile", TrackedZipFile)
+    result = _patch(previous, delta)
+    if "file" in result:
+        result["file"]["output"].close()
+
+    assert opened
+    assert all(zip_file.fp is None for zip_file in opened)
@@ -0,0 +1,86 @@
+"""
+结果详细程度测试：summary 时不生成文件列表，也不再遍历清单；full 时返回完整的文件列表
+"""
+import json
+
+import pytest
+
+from tools.create_files_from_structure import (
+    CompressionCache,
+    FileManifest,
+    build_archive,
+    build_batch,
+    patch_archive,
+    summarize_result,
+)
+
+STRUCTURE = json.dumps({
+    "files": [{"filename": f"src/m{i}.py", "content": f"print({i})\n"} for i in range(3)],
+    "file_structure": ["docs/", "empty.txt"],
+})
+
+
+def _close(result: dict) -> dict:
+    assert "error" not in result, result
+    result["file"]["output"].close()
+    return result["result"]
+
+
+@pytest.fixture
+def no_second_walk(monkeypatch):
+    def iter_files(self):
+        raise AssertionError("manifest walked a second time")
+
+    monkeypatch.setattr(FileManifest, "iter_files", iter_files)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_summary_skips_file_lists(no_second_walk, streaming):
+    info = _close(build_archive(STRUCTURE, streaming=streaming, cache=CompressionCache(0), result_detail="summary"))
+
+    assert info["total_files"] == 4
+    assert "created_files" not in info
+    assert "file_structure" not in info
+
+
+def test_summary_skips_file_lists_for_patch_and_combined(no_second_walk):
+    previous = build_archive(STRUCTURE, cache=CompressionCache(0), result_detail="summary")
+    data = previous["file"]["output"].getvalue()
+    _close(previous)
+    delta = json.dumps({"files": [{"filename": "src/m0.py", "content": "changed\n"}]})
+    info = _close(patch_archive(data, delta, cache=CompressionCache(0), result_detail="summary"))
+    assert info["unchanged"] == 3
+    assert "file_structure" not in info
+
+    batch = json.dumps([json.loads(STRUCTURE), json.loads(STRUCTURE)])
+    info = _close(build_batch(batch, "combined", cache=CompressionCache(0), result_detail="summary"))
+    assert info["total_files"] == 8
+    assert "file_structure" not in info
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_full_lists_every_file(streaming):
+    info = _close(build_archive(STRUCTURE, streaming=streaming, cache=CompressionCache(0), result_detail="full"))
+
+    assert sorted(info["created_files"]) == ["empty.txt", "src/m0.py", "src/m1.py", "src/m2.py"]
+    assert sorted(info["file_structure"]) == ["empty.txt", "src/m0.py", "src/m1.py", "src/m2.py"]
+
+
+def test_summary_reports_compression_cache():
+    cache = CompressionCache()
+    for _ in range(2):
+        result = build_archive(STRUCTURE, cache=cache, result_detail="summary")
+        summary = summarize_result(result, "summary")
+        result["file"]["output"].close()
+
+    assert summary["compression_cache"]["hits"] == 3
+    assert summary["compression_cache"]["misses"] == 0
+    json.dumps(summary)
+
+
+def test_summary_without_cache_for_tar():
+    result = build_archive(STRUCTURE, cache=CompressionCache(0), archive_format="tar", result_detail="summary")
+    summary = summarize_result(result, "summary")
+    result["file"]["output"].close()
+
+    assert "compression_cache" not in summary
@@ -0,0 +1,49 @@
+"""
+流式解析与非流式解析的一致性测试：同一结构不论长度如何，得到的压缩包内容与重复文件列表都应相同
+"""
+import io
+import json
+import zipfile
+
+import pytest
+
+from tools.create_files_from_structure import CompressionCache, build_archive
+
+CASES = {
+    "explicit_null_then_content": {
+        "files": [{"filename": "a.txt", "content": None}, {"filename": "a.txt", "content": "real"}],
+    },
+    "content_then_duplicate": {
+        "files": [{"filename": "a.txt", "content": "first"}, {"filename": "a.txt", "content": "second"}],
+    },
+    "file_structure_then_content": {
+        "files": [{"filename": "src/a.py", "content": "print()\n"}],
+        "file_structure": ["src/a.py", "src/empty.py", "docs/"],
+    },
+}
+
+
+def _build(structure: str, streaming: bool) -> tuple[dict, list]:
+    result = build_archive(structure, streaming=streaming, cache=CompressionCache(0))
+    assert "error" not in result, result
+    output = result["file"]["output"]
+    try:
+        with zipfile.ZipFile(io.BytesIO(output.getvalue())) as zip_file:
+            contents = {name: zip_file.read(name) for name in zip_file.namelist()}
+    finally:
+        output.close()
+    return contents, result["result"]["duplicates"]
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_streaming_matches_non_streaming(name):
+    structure = json.dumps(CASES[name])
+
+    assert _build(structure, streaming=True) == _build(structure, streaming=False)
+
+
+def test_explicit_null_content_is_an_empty_file():
+    contents, duplicates = _build(json.dumps(CASES["explicit_null_then_content"]), streaming=False)
+
+    assert contents == {"a.txt": b""}
+    assert duplicates == ["a.txt"]
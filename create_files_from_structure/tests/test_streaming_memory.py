@@ -0,0 +1,79 @@
+"""
+流式解析的内存上限测试：在独立子进程中构建约 150MB 的结构，峰值内存减去输入本身应保持在固定上限内
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+
+INPUT_SIZE = 150 * 1024 * 1024
+
+# 峰值内存超出（进程基线 + 输入字符串）的上限；非流式解析时约为 180MB
+MAX_OVERHEAD = 64 * 1024 * 1024
+
+# 子进程脚本：用 join 拼接共享的内容片段生成结构，生成过程本身只占用约一份输入大小的内存。
+# 峰值取 /proc/self/status 中的 VmHWM：ru_maxrss 在 exec 时会继承父进程（pytest）的峰值，不能反映子进程自身
+SCRIPT = """
+import json
+import sys
+from tools.create_files_from_structure import build_archive
+
+
+def status(key):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(key + ":"):
+                return int(line.split()[1]) * 1024
+
+
+def generate(target):
+    chunks = [("line %d of the generated module body\\\\n" % i) * 120 for i in range(64)]
+    parts = ['{"files": [']
+    size = 0
+    index = 0
+    while size < target:
+        content = chunks[index % 64]
+        parts.append('%s{"filename": "pkg%d/mod_%d.py", "content": "' % ("," if index else "", index % 100, index))
+        parts.append(content)
+        parts.append('"}')
+        size += len(content)
+        index += 1
+    parts.append("]}")
+    return "".join(parts), index
+
+
+baseline = status("VmRSS")
+structure, count = generate(int(sys.argv[1]))
+result = build_archive(structure, streaming=True, compression="fast")
+if "error" in result:
+    raise SystemExit(str(result))
+result["file"]["output"].close()
+print(json.dumps({
+    "baseline": baseline,
+    "peak": status("VmHWM"),
+    "input_size": len(structure),
+    "files": result["result"]["total_files"],
+    "expected_files": count,
+}))
+"""
+
+
+@pytest.mark.skipif(not Path("/proc/self/status").exists(), reason="requires /proc/self/status")
+def test_streaming_peak_memory_is_bounded():
+    completed = subprocess.run(
+        [sys.executable, "-c", SCRIPT, str(INPUT_SIZE)],
+        cwd=PLUGIN_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=600,
+    )
+    assert completed.returncode == 0, completed.stderr
+    stats = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    assert stats["files"] == stats["expected_files"]
+    overhead = stats["peak"] - stats["baseline"] - stats["input_size"]
+    assert overhead < MAX_OVERHEAD, stats
@@ -7,9 +7,24 @@ from typing import Any
 from pathlib import Path
 import os
 import json
+import posixpath
+import re
 import tempfile
+import tarfile
 import zipfile
+import zlib
+import gzip
+import struct
+import lzma
+import hashlib
+import threading
 import io
+import time
+import logging
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 class CreateFilesFromStructureTool(Tool):
@@ -18,130 +33,1758 @@ class CreateFilesFromStructureTool(Tool):
         try:
             
             structure = tool_parameters.get("structure", "")
+            compression = tool_parameters.get("compression") or "balanced"
+            archive_format = tool_parameters.get("archive_format") or "zip"
+            previous_archive = tool_parameters.get("previous_archive")
+            batch_output = tool_parameters.get("batch_output") or "separate"
+            result_detail = tool_parameters.get("result_detail") or "summary"
             # yield self.create_text_message(f"test")
+            if result_detail not in RESULT_DETAILS:
+                yield self.create_text_message(f"Error exporting: Result detail must be one of {', '.join(RESULT_DETAILS)}")
+                return
 
-            result = create_files_from_structure(structure)
+            if _is_batch(structure):
+                # 批量模式：每个结构单独输出结果，单个结构出错不影响其他结构
+                if previous_archive:
+                    yield self.create_text_message("Error exporting: Batch mode cannot be combined with a previous archive")
+                    return
+                if batch_output != "separate":
+                    results = [build_batch(
+                        structure,
+                        batch_output,
+                        compression=compression,
+                        archive_format=archive_format,
+                        result_detail=result_detail,
+                    )]
+                else:
+                    # 每个结构的压缩包输出后立即关闭，再取下一个结果
+                    results = iter_batch(structure, compression=compression, archive_format=archive_format, result_detail=result_detail)
+                for result in results:
+                    try:
+                        yield from self._emit_result(result, result_detail)
+                    except Exception as e:
+                        yield self.create_text_message(f"Error exporting {result.get('name', '')}: {str(e)}")
+                return
+
+            if previous_archive:
+                # 增量模式：在上一次的压缩包基础上应用变更
+                result = patch_archive(
+                    previous_archive.blob,
+                    structure,
+                    compression=compression,
+                    archive_format=archive_format,
+                    result_detail=result_detail,
+                )
+            else:
+                result = build_archive(structure, compression=compression, archive_format=archive_format, result_detail=result_detail)
             # yield self.create_text_message(f"test1")
 
-            result_info = str(result)
-            # yield self.create_text_message(f"test2")
+            yield from self._emit_result(result, result_detail)
+        except Exception as e:
+            yield self.create_text_message(f"Error exporting: {str(e)}")
+            return
+
+    def _emit_result(self, result: dict, detail: str = "summary") -> Generator[ToolInvokeMessage]:
+        """
+        输出一次构建的结果摘要、压缩包与分阶段统计；构建失败时只输出错误信息，压缩包输出后（或出错时）关闭
+        """
+        if "file" not in result:
+            yield self.create_text_message(str(result))
+            return
+
+        try:
             # 输出文件信息
-            yield self.create_text_message(
-                result_info
-            )
-            # yield self.create_text_message(f"test3")
+            yield self.create_json_message(summarize_result(result, detail))
 
-            zip_name = result["file"]["filename"]
-            zip_data = result["file"]["data"]
-            # yield self.create_text_message(f"test4")
             # 输出压缩文件
-            yield self.create_blob_message(
-                blob=zip_data,
+            metrics = result["metrics"]
+            yield from self._emit_archive(result["file"], metrics)
+        finally:
+            # 不论输出是否出错（或调用方提前结束），都释放压缩包
+            result["file"]["output"].close()
+
+        # 输出分阶段耗时与字节统计
+        metrics_info = metrics.to_dict()
+        yield self.create_json_message(metrics_info)
+        _report_metrics(metrics_info)
+
+    def _emit_archive(self, file_info: dict, metrics: "BuildMetrics") -> Generator[ToolInvokeMessage]:
+        """
+        输出压缩包：不超过 BLOB_SPLIT_THRESHOLD 时作为单个文件输出，
+        否则按 BLOB_PART_SIZE 拆分为多个分卷依次输出，最后输出分卷索引用于合并
+
+        消息生成的耗时计入 emit 阶段，不包括下游处理消息的时间
+        """
+        output = file_info["output"]
+        start = time.perf_counter()
+        if output.size <= BLOB_SPLIT_THRESHOLD:
+            message = self.create_blob_message(
+                blob=output.getvalue(),
                 meta={
-                    "filename" : zip_name,
-                    "mime_type": "application/zip"
+                    "filename" : file_info["filename"],
+                    "mime_type": file_info["mime_type"]
                 }
             )
-        except Exception as e:
-            yield self.create_text_message(f"Error exporting: {str(e)}")
+            metrics.add("emit", start)
+            yield message
             return
 
+        parts = []
+        digest = hashlib.sha256()
+        for index, chunk in enumerate(output.iter_chunks(BLOB_PART_SIZE), 1):
+            part_name = f"{file_info['filename']}.{index:03d}"
+            digest.update(chunk)
+            parts.append({"filename": part_name, "size": len(chunk)})
+            message = self.create_blob_message(
+                blob=chunk,
+                meta={
+                    "filename" : part_name,
+                    "mime_type": "application/octet-stream"
+                }
+            )
+            chunk = None
+            metrics.add("emit", start)
+            yield message
+            message = None
+            start = time.perf_counter()
+
+        # 输出分卷索引
+        part_names = " ".join(part["filename"] for part in parts)
+        yield self.create_text_message(json.dumps({
+            "filename": file_info["filename"],
+            "mime_type": file_info["mime_type"],
+            "size": output.size,
+            "sha256": digest.hexdigest(),
+            "parts": parts,
+            "reassemble": f"cat {part_names} > {file_info['filename']}"
+        }, ensure_ascii=False, indent=2))
 
 
 
-def create_files_from_structure(structure: str) -> dict:
+
+# 压缩包内普通文件与目录的权限位，与临时目录写盘后 zip_file.write() 得到的一致
+ZIP_FILE_ATTR = 0o100644 << 16
+ZIP_DIR_ATTR = (0o40755 << 16) | 0x10
+
+# 结构字符串超过该长度时自动切换为流式解析，避免同时持有完整的 JSON 对象
+STREAMING_THRESHOLD = 8 * 1024 * 1024
+
+
+def _env_int(name: str, default: int) -> int:
+    """
+    读取正整数环境变量，未设置或不合法时使用默认值
+    """
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        logging.getLogger(__name__).warning("Ignoring invalid %s=%r", name, value)
+        return default
+    return number
+
+
+def _available_cpus() -> int:
+    """
+    插件容器实际可用的 CPU 数：取 CPU 亲和性与 cgroup v2 配额（cpu.max）中较小的一个，
+    不支持时退回主机核数
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0)) or 1
+    else:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+# 并行压缩：默认线程数、启用并行的最小结构长度，以及等待写入的压缩结果上限；
+# 线程数与最小长度可由插件运行环境的环境变量 CREATE_FILES_WORKERS / CREATE_FILES_PARALLEL_THRESHOLD 覆盖
+DEFAULT_WORKERS = _env_int("CREATE_FILES_WORKERS", _available_cpus())
+PARALLEL_THRESHOLD = _env_int("CREATE_FILES_PARALLEL_THRESHOLD", 4 * 1024 * 1024)
+PARALLEL_WINDOW_BYTES = 32 * 1024 * 1024
+
+# 压缩结果缓存的容量上限（插件内存上限为 256MB），以及每个缓存条目的估算额外开销
+COMPRESSION_CACHE_BYTES = 32 * 1024 * 1024
+CACHE_ENTRY_OVERHEAD = 256
+
+# 压缩档位对应的 deflate/gzip 级别
+COMPRESSION_LEVELS = {"fast": 1, "balanced": 6, "max": 9}
+
+# xz 预设：9 级压缩需要约 674MB 内存，超出插件上限，max 档使用 6 级加 extreme 标志（约 94MB）
+XZ_PRESETS = {"fast": 1, "balanced": 3, "max": 6 | lzma.PRESET_EXTREME}
+
+# 小于该长度的文件直接存储；较大文件先试压缩一段样本，压缩率过低时同样直接存储
+STORE_MAX_SIZE = 64
+TRIAL_SAMPLE_SIZE = 4096
+TRIAL_MIN_RATIO = 0.95
+
+# 压缩包超过该大小时从内存转存到临时文件
+SPOOL_MAX_MEMORY = 32 * 1024 * 1024
+
+# 压缩包超过该大小时拆分为多个分卷输出；SDK 发送 blob 时会再复制一份切片，单个 blob 越大峰值内存越高
+BLOB_SPLIT_THRESHOLD = 32 * 1024 * 1024
+BLOB_PART_SIZE = 16 * 1024 * 1024
+
+# 分阶段统计的阶段名称：JSON 解析、清单构建、文件内容生成、压缩、压缩包收尾、消息输出
+METRIC_PHASES = ("parse", "manifest", "materialize", "compress", "finalize", "emit")
+
+# 结果摘要中目录树展开的层数（更深的目录合并到上级目录的统计中）与最多显示的行数
+SUMMARY_TREE_DEPTH = 2
+SUMMARY_TREE_LINES = 50
+
+# 结果信息的详细程度：摘要 / 附带完整文件列表
+RESULT_DETAILS = ("summary", "full")
+
+# 批量模式的输出方式：每个结构一个压缩包 / 合并为一个压缩包
+BATCH_OUTPUTS = ("separate", "combined")
+
+# separate 模式同时构建的结构数上限（与主机核数无关），以及同时构建的结构在输入中的总长度上限；
+# 每个构建中的结构要持有解析后的内容、编码后的字节与最多 SPOOL_MAX_MEMORY 的压缩包，约为输入长度的 5 倍，
+# 单个结构超过上限时单独构建
+BATCH_MAX_WORKERS = 2
+BATCH_WINDOW_BYTES = 16 * 1024 * 1024
+
+# 支持的压缩包格式：(MIME 类型, 文件扩展名)
+ARCHIVE_FORMATS = {
+    "zip": ("application/zip", "zip"),
+    "tar": ("application/x-tar", "tar"),
+    "tar.gz": ("application/gzip", "tar.gz"),
+    "tar.xz": ("application/x-xz", "tar.xz"),
+}
+
+
+def create_files_from_structure(structure: str, **options) -> dict:
     """
     根据提供的文件结构创建目录和文件，并返回zip压缩包
     
     Args:
         structure: 包含文件结构的数组对象
+        options: 构建选项，同 build_archive
         
     Returns:
         dict: 包含zip文件数据的字典
     """
+    result = build_archive(structure, **options)
+    if "file" in result:
+        output = result["file"].pop("output")
+        result["file"]["data"] = output.getvalue()
+        output.close()
+    return result
+
+
+def build_archive(
+    structure: str | dict,
+    use_temp_dir: bool = False,
+    streaming: bool | None = None,
+    workers: int | None = None,
+    parallel_threshold: int = PARALLEL_THRESHOLD,
+    cache: "CompressionCache | None" = None,
+    compression: str = "balanced",
+    archive_format: str = "zip",
+    result_detail: str = "full",
+) -> dict:
+    """
+    根据提供的文件结构构建压缩包，压缩包写入 ArchiveOutput，较大时自动转存到临时文件
+    
+    Args:
+        structure: 包含文件结构的数组对象，也可以是已经解析好的结构对象（此时不流式解析，也不按长度决定线程数）
+        use_temp_dir: 是否使用临时目录写盘后再打包（旧流程，仅作为兜底），默认直接在内存中构建压缩包
+        streaming: 是否流式解析 files 数组，逐个条目写入压缩包；None 时按结构字符串长度自动选择
+        workers: 并行压缩的线程数，None 时使用 CPU 核数
+        parallel_threshold: 结构字符串短于该长度时使用单线程压缩
+        cache: 压缩结果缓存，None 时使用进程内共享的 COMPRESSION_CACHE
+        compression: 压缩档位，fast / balanced / max
+        archive_format: 压缩包格式，zip / tar / tar.gz / tar.xz
+        result_detail: 结果信息的详细程度，summary 时不生成 created_files / file_structure 文件列表
+        
+    Returns:
+        dict: 结果信息、压缩包输出（file.output，使用完毕后需调用 output.close()）与分阶段统计（metrics）
+    """
+    output = None
     try:
         # 解析输入参数
-        if not structure or not isinstance(structure, str):
+        error = _validate_options(structure, compression, archive_format)
+        if error:
+            return error
+        parsed = isinstance(structure, dict)
+        metrics = BuildMetrics(input_size=0 if parsed else len(structure))
+        if use_temp_dir and archive_format != "zip":
             return {
                 "error": "Invalid input",
-                "details": "Structure must be a string"
+                "details": "Temp dir mode only supports zip"
             }
 
-        # 字符串转JSON
-        structure = json.loads(structure)
+        if parsed:
+            streaming = False
+        elif streaming is None:
+            streaming = len(structure) >= STREAMING_THRESHOLD
+        if workers is None:
+            workers = DEFAULT_WORKERS
+        if not parsed and len(structure) < parallel_threshold:
+            workers = 1
 
-        file_structure = []
-        files_data = []
-        
-        for item in structure["files"]:
-            files_data.append(item)
-            file_structure.append(item["filename"])
+        if cache is None:
+            cache = COMPRESSION_CACHE
 
-        # 创建临时目录
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            
-            # 确保所有文件都存在于 file_structure 中
-            for file_data in files_data:
-                filename = file_data.get('filename')
-                if filename and filename not in file_structure:
-                    file_structure.append(filename)
-            
-            # 创建目录结构
-            created_files = []
-            for file_path in file_structure:
-                full_path = temp_path / file_path
-                
-                # 创建父目录
-                full_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # 查找文件内容
-                content = None
-                for file_data in files_data:
-                    if file_data.get('filename') == file_path:
-                        content = file_data.get('content', '')
-                        break
-                
-                # 写入文件内容
-                if content is not None:
-                    full_path.write_text(content, encoding='utf-8')
-                    created_files.append(str(full_path))
+        cache_info = None
+        output = ArchiveOutput()
+        if use_temp_dir:
+            # 字符串转JSON
+            if not parsed:
+                with metrics.phase("parse"):
+                    structure = json.loads(structure)
+            with metrics.phase("manifest"):
+                manifest = FileManifest.from_structure(structure)
+            summary = ArchiveSummary()
+            created_files = _build_zip_via_temp_dir(manifest, output.file, metrics, summary)
+        else:
+            with _create_writer(output.file, archive_format, compression, workers, cache, metrics) as writer:
+                if streaming:
+                    # 边解析边写入，每个条目的内容写入后立即释放
+                    manifest, created_files = _write_streaming(writer, structure, result_detail == "full")
                 else:
-                    # 如果没有内容，创建空文件
-                    full_path.touch()
-                    created_files.append(str(full_path))
-            
-            # 创建zip文件
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for root, dirs, files in os.walk(temp_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, temp_dir)
-                        zip_file.write(file_path, arcname)
-            
-            zip_buffer.seek(0)
-            zip_data = zip_buffer.read()
-            
-            # 创建结果信息
-            result_info = {
-                "total_files": len(created_files),
-                "created_files": created_files,
-                "file_structure": file_structure,
-                "timestamp": datetime.now().isoformat()
-            }
+                    # 字符串转JSON
+                    if not parsed:
+                        with metrics.phase("parse"):
+                            structure = json.loads(structure)
+
+                    # 一次遍历建立文件清单索引
+                    with metrics.phase("manifest"):
+                        manifest = FileManifest.from_structure(structure)
+                    created_files = writer.write_entries(manifest, list(manifest.entries))
+            summary = writer.summary
+            if writer.cache is not None:
+                cache_info = {"hits": writer.cache_hits, "misses": writer.cache_misses, **cache.stats()}
+
+        # 创建结果信息，完整文件列表需要再遍历一次清单，只在 full 时生成
+        result_info = {"total_files": manifest.file_count}
+        if result_detail == "full":
+            result_info["created_files"] = created_files
+            result_info["file_structure"] = list(manifest.iter_files())
+        result_info.update({
+            "duplicates": manifest.duplicates,
+            "compression_cache": cache_info,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+        metrics.compressed_bytes = output.size
+        mime_type, extension = ARCHIVE_FORMATS[archive_format]
+        return {
+            "result": result_info,
+            "file": {
+                "output": output,
+                "mime_type": mime_type,
+                "filename": f"created_files_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+            },
+            "summary": summary,
+            "metrics": metrics
+        }
             
+    except Exception as e:
+        if output is not None:
+            output.close()
+        return {
+            "error": "Failed to create files",
+            "details": str(e)
+        }
+
+
+def patch_archive(
+    previous_archive: bytes,
+    structure: str,
+    workers: int | None = None,
+    parallel_threshold: int = PARALLEL_THRESHOLD,
+    cache: "CompressionCache | None" = None,
+    compression: str = "balanced",
+    archive_format: str = "zip",
+    result_detail: str = "full",
+) -> dict:
+    """
+    在上一次生成的zip压缩包上应用增量结构，只压缩新增或修改的文件，未改动的条目直接复制原有的压缩数据
+
+    增量结构与完整结构格式相同，files 中为新增或修改的文件，另外可用 deleted 列出需要删除的文件或目录
+
+    Args:
+        previous_archive: 上一次生成的zip压缩包数据
+        structure: 增量结构字符串
+        workers: 并行压缩的线程数，None 时使用 CPU 核数
+        parallel_threshold: 增量结构字符串短于该长度时使用单线程压缩
+        cache: 压缩结果缓存，None 时使用进程内共享的 COMPRESSION_CACHE
+        compression: 压缩档位，fast / balanced / max
+        archive_format: 压缩包格式，增量模式只支持 zip
+        result_detail: 结果信息的详细程度，summary 时不生成 file_structure 文件列表
+
+    Returns:
+        dict: 结果信息、压缩包输出（file.output，使用完毕后需调用 output.close()）与分阶段统计（metrics）
+    """
+    output = None
+    try:
+        # 解析输入参数
+        error = _validate_options(structure, compression, archive_format)
+        if error:
+            return error
+        metrics = BuildMetrics(input_size=len(structure))
+        if archive_format != "zip":
             return {
-                "result": result_info,
-                "file": {
-                    "data": zip_data,
-                    "mime_type": "application/zip",
-                    "filename": f"created_files_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-                }
+                "error": "Invalid input",
+                "details": "Patch mode only supports zip"
             }
-            
+
+        if workers is None:
+            workers = DEFAULT_WORKERS
+        if len(structure) < parallel_threshold:
+            workers = 1
+        if cache is None:
+            cache = COMPRESSION_CACHE
+
+        # 字符串转JSON
+        with metrics.phase("parse"):
+            structure = json.loads(structure)
+            previous = zipfile.ZipFile(io.BytesIO(previous_archive))
+
+        with previous:
+            # 按原压缩包的顺序建立新清单，修改的文件保留原位置，新增的文件追加在末尾
+            start = time.perf_counter()
+            delta = FileManifest.from_structure(structure)
+            deleted = {_normalize_arcname(path) for path in structure.get("deleted") or []}
+            manifest = FileManifest()
+            copied = {}
+            added, modified, removed = [], [], []
+            unchanged = 0
+            for info in previous.infolist():
+                arcname = _normalize_arcname(info.filename)
+                # 同一变更中删除后又重新给出内容的文件视为修改，保留原位置
+                replaced = not info.is_dir() and delta.entries.get(arcname) is not None
+                if _is_deleted(arcname, deleted) and not replaced:
+                    if not info.is_dir():
+                        removed.append(arcname)
+                    continue
+                if info.is_dir():
+                    if arcname + "/" in manifest.add_directory(arcname):
+                        copied[arcname + "/"] = info
+                elif delta.entries.get(arcname) is not None:
+                    manifest.add_file(arcname, delta.entries[arcname])
+                    modified.append(arcname)
+                elif manifest.add_file(arcname):
+                    copied[arcname] = info
+                    unchanged += 1
+
+            for arcname, content in delta.entries.items():
+                if arcname in manifest.entries:
+                    continue
+                if arcname.endswith("/"):
+                    manifest.add_directory(arcname)
+                else:
+                    manifest.add_file(arcname, content)
+                    added.append(arcname)
+            metrics.add("manifest", start)
+
+            output = ArchiveOutput()
+            with ZipArchiveWriter(output.file, workers, cache, COMPRESSION_LEVELS[compression], metrics) as writer:
+                for arcname in list(manifest.entries):
+                    if arcname in copied:
+                        writer.copy_entry(previous, copied[arcname], arcname)
+                    else:
+                        writer.write_entries(manifest, [arcname])
+
+        # 创建结果信息
+        result_info = {
+            "total_files": manifest.file_count,
+            "added": added,
+            "modified": modified,
+            "deleted": removed,
+            "unchanged": unchanged,
+            "duplicates": delta.duplicates,
+            "compression_cache": {"hits": writer.cache_hits, "misses": writer.cache_misses, **cache.stats()},
+            "timestamp": datetime.now().isoformat()
+        }
+        if result_detail == "full":
+            result_info["file_structure"] = list(manifest.iter_files())
+
+        metrics.compressed_bytes = output.size
+        return {
+            "result": result_info,
+            "file": {
+                "output": output,
+                "mime_type": ARCHIVE_FORMATS["zip"][0],
+                "filename": f"created_files_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+            },
+            "summary": writer.summary,
+            "metrics": metrics
+        }
+
+    except Exception as e:
+        if output is not None:
+            output.close()
+        return {
+            "error": "Failed to patch archive",
+            "details": str(e)
+        }
+
+
+def build_batch(
+    structures: str,
+    batch_output: str = "separate",
+    workers: int | None = None,
+    cache: "CompressionCache | None" = None,
+    compression: str = "balanced",
+    archive_format: str = "zip",
+    result_detail: str = "full",
+) -> dict:
+    """
+    批量构建：structures 为结构对象组成的 JSON 数组，每个结构可用 name 指定名称（默认为 structure_<序号>）
+
+    separate 模式在线程池中并发构建，每个结构返回各自的压缩包；
+    combined 模式把每个结构放在以其名称命名的顶层目录下，合并为一个压缩包。
+    单个结构出错时只在对应的条目中返回错误信息，不影响其他结构
+
+    separate 模式会一次持有所有结构的压缩包，逐个输出时应使用 iter_batch
+
+    Args:
+        structures: 结构数组的 JSON 字符串
+        batch_output: 输出方式，separate / combined
+        workers: 线程数；combined 模式下为压缩线程数，None 时使用 CPU 核数；
+                 separate 模式下为同时构建的结构数，None 时为 BATCH_MAX_WORKERS，且不超过该值
+        cache: 压缩结果缓存，None 时使用进程内共享的 COMPRESSION_CACHE
+        compression: 压缩档位，fast / balanced / max
+        archive_format: 压缩包格式，zip / tar / tar.gz / tar.xz
+        result_detail: 结果信息的详细程度，summary 时不生成文件列表
+
+    Returns:
+        dict: separate 模式为 {"items": [每个结构的构建结果]}，构建结果与 build_archive 相同并附带 name；
+              combined 模式与 build_archive 相同，result.items 为每个结构的文件数或错误信息
+    """
+    if batch_output not in BATCH_OUTPUTS:
+        return {
+            "error": "Invalid input",
+            "details": f"Batch output must be one of {', '.join(BATCH_OUTPUTS)}"
+        }
+    if batch_output == "combined":
+        return _build_batch_combined(structures, workers, cache, compression, archive_format, result_detail)
+
+    items = list(iter_batch(structures, workers, cache, compression, archive_format, result_detail))
+    if len(items) == 1 and "name" not in items[0]:
+        return items[0]
+    return {"items": items}
+
+
+def iter_batch(
+    structures: str,
+    workers: int | None = None,
+    cache: "CompressionCache | None" = None,
+    compression: str = "balanced",
+    archive_format: str = "zip",
+    result_detail: str = "full",
+) -> Generator[dict, None, None]:
+    """
+    批量构建的 separate 模式：逐个解析数组中的结构并提交到线程池，按提交顺序产出构建结果
+
+    同时构建的结构不超过 workers 个（最多 BATCH_MAX_WORKERS 个），且它们在输入中的总长度不超过 BATCH_WINDOW_BYTES；
+    超出时先产出最早提交的结果，调用方取走后再提交下一个结构。每个压缩包输出后应立即调用 output.close()
+
+    Yields:
+        dict: 与 build_archive 相同的构建结果并附带 name；输入本身不合法时只产出一条不带 name 的错误信息
+    """
+    error = _validate_options(structures, compression, archive_format)
+    if error:
+        yield error
+        return
+    workers = max(1, min(workers or BATCH_MAX_WORKERS, BATCH_MAX_WORKERS))
+    if cache is None:
+        cache = COMPRESSION_CACHE
+    extension = ARCHIVE_FORMATS[archive_format][1]
+
+    def finish(name: str, size: int, job) -> dict:
+        if isinstance(job, dict):
+            return {"name": name, **job}
+        try:
+            result = job.result()
+        except Exception as e:
+            return {"name": name, "error": "Failed to create files", "details": str(e)}
+        if "file" in result:
+            result["file"]["filename"] = f"{name.replace('/', '_')}.{extension}"
+            result["metrics"].input_size = size
+        return {"name": name, **result}
+
+    executor = _create_executor(workers)
+    pending = deque()
+    pending_bytes = 0
+    try:
+        for name, item, size, error in _iter_batch_items(structures):
+            # 按数量与输入长度限制同时构建的结构，至少保留一个
+            while pending and (len(pending) >= workers or pending_bytes + size > BATCH_WINDOW_BYTES):
+                pending_bytes -= pending[0][1]
+                yield finish(*pending.popleft())
+            # 条目之间已经并发，单个条目内部不再并行压缩
+            job = error or executor.submit(
+                build_archive,
+                item,
+                workers=1,
+                cache=cache,
+                compression=compression,
+                archive_format=archive_format,
+                result_detail=result_detail,
+            )
+            # 解析出的结构只由线程池中的任务持有，构建完成后即可释放
+            item = None
+            pending.append((name, size, job))
+            pending_bytes += size
+        while pending:
+            yield finish(*pending.popleft())
+    finally:
+        # 调用方提前结束迭代时，关闭已经构建但未取走的压缩包
+        while pending:
+            result = finish(*pending.popleft())
+            if "file" in result:
+                result["file"]["output"].close()
+        executor.shutdown(wait=True)
+
+
+def _iter_batch_items(structures: str) -> Generator[tuple[str, dict | None, int, dict | None], None, None]:
+    """
+    逐个解析结构数组中的元素并确定名称，名称不合法或重复的结构记为错误
+
+    Yields:
+        tuple: (名称, 结构对象, 该元素在输入中的长度, 错误信息)，出错时结构对象为 None
+    """
+    # 已使用的名称，以及这些名称的各级上级路径
+    used = set()
+    parents = set()
+    index = 0
+    try:
+        for index, (item, size) in enumerate(_iter_array(structures), 1):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("Structure must be an object")
+                name = item.get("name")
+                name = _normalize_arcname(name if name is not None else f"structure_{index}")
+                # 合并模式下名称即顶层目录，互为上下级的名称同样视为重复；只查找名称的各级上级路径，不遍历已有名称
+                parts = name.split("/")
+                ancestors = ["/".join(parts[:depth]) for depth in range(1, len(parts))]
+                if name in used or name in parents or any(ancestor in used for ancestor in ancestors):
+                    raise ValueError(f"Duplicate name {name!r}")
+            except Exception as e:
+                yield f"structure_{index}", None, size, {"error": "Invalid input", "details": str(e)}
+                continue
+            used.add(name)
+            parents.update(ancestors)
+            yield name, item, size, None
+            item = None
+    except Exception as e:
+        # 数组本身的 JSON 语法错误之后无法继续解析，已产出的结构不受影响
+        yield f"structure_{index + 1}", None, 0, {"error": "Invalid input", "details": str(e)}
+        return
+    if not index:
+        yield "structure_1", None, 0, {"error": "Invalid input", "details": "Batch structure must be a non-empty array"}
+
+
+def _build_batch_combined(
+    structures: str,
+    workers: int | None,
+    cache: "CompressionCache | None",
+    compression: str,
+    archive_format: str,
+    result_detail: str = "full",
+) -> dict:
+    """
+    把多个结构合并为一个压缩包：每个结构先单独建立清单，成功后再加上名称前缀写入，
+    出错的结构不会在压缩包中留下任何条目
+    """
+    output = None
+    try:
+        error = _validate_options(structures, compression, archive_format)
+        if error:
+            return error
+        if workers is None:
+            workers = DEFAULT_WORKERS
+        # 合并模式共用一个写入器，与 build_archive 一样按输入长度决定是否并行压缩
+        if len(structures) < PARALLEL_THRESHOLD:
+            workers = 1
+        if cache is None:
+            cache = COMPRESSION_CACHE
+
+        metrics = BuildMetrics(input_size=len(structures))
+        output = ArchiveOutput()
+        manifest = FileManifest()
+        item_results = []
+        with _create_writer(output.file, archive_format, compression, workers, cache, metrics) as writer:
+            start = time.perf_counter()
+            for name, item, size, error in _iter_batch_items(structures):
+                start = metrics.add("parse", start)
+                if error:
+                    item_results.append({"name": name, **error})
+                    start = time.perf_counter()
+                    continue
+                try:
+                    item_manifest = FileManifest.from_structure(item)
+                    item = None
+                    added = manifest.add_directory(name)
+                    for arcname, content in item_manifest.entries.items():
+                        if arcname.endswith("/"):
+                            added.extend(manifest.add_directory(f"{name}/{arcname}"))
+                        else:
+                            added.extend(manifest.add_file(f"{name}/{arcname}", content))
+                    manifest.duplicates.extend(f"{name}/{arcname}" for arcname in item_manifest.duplicates)
+                    item_manifest = None
+                    metrics.add("manifest", start)
+                except Exception as e:
+                    item_results.append({"name": name, "error": "Invalid input", "details": str(e)})
+                    start = time.perf_counter()
+                    continue
+                files = writer.write_entries(manifest, added)
+                item_results.append({"name": name, "total_files": len(files)})
+                start = time.perf_counter()
+
+        metrics.compressed_bytes = output.size
+        result_info = {
+            "total_files": manifest.file_count,
+            "items": item_results,
+            "duplicates": manifest.duplicates,
+            "timestamp": datetime.now().isoformat()
+        }
+        if result_detail == "full":
+            result_info["file_structure"] = list(manifest.iter_files())
+        if writer.cache is not None:
+            result_info["compression_cache"] = {"hits": writer.cache_hits, "misses": writer.cache_misses, **cache.stats()}
+        mime_type, extension = ARCHIVE_FORMATS[archive_format]
+        return {
+            "result": result_info,
+            "file": {
+                "output": output,
+                "mime_type": mime_type,
+                "filename": f"created_files_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+            },
+            "summary": writer.summary,
+            "metrics": metrics
+        }
+
     except Exception as e:
+        if output is not None:
+            output.close()
         return {
             "error": "Failed to create files",
             "details": str(e)
         }
+
+
+def _is_batch(structure) -> bool:
+    """
+    结构字符串的顶层为数组时视为批量输入；只检查第一个非空白字符，不复制输入
+    """
+    if not isinstance(structure, str):
+        return False
+    return structure.startswith("[", _WHITESPACE.match(structure).end())
+
+
+def _validate_options(structure: str | dict, compression: str, archive_format: str) -> dict | None:
+    """
+    校验输入参数，不合法时返回错误信息
+    """
+    if not isinstance(structure, dict) and (not structure or not isinstance(structure, str)):
+        return {
+            "error": "Invalid input",
+            "details": "Structure must be a string"
+        }
+    if compression not in COMPRESSION_LEVELS:
+        return {
+            "error": "Invalid input",
+            "details": f"Compression must be one of {', '.join(COMPRESSION_LEVELS)}"
+        }
+    if archive_format not in ARCHIVE_FORMATS:
+        return {
+            "error": "Invalid input",
+            "details": f"Archive format must be one of {', '.join(ARCHIVE_FORMATS)}"
+        }
+    return None
+
+
+def _is_deleted(arcname: str, deleted: set) -> bool:
+    """
+    判断路径本身或其所在的任一上级目录是否被删除
+    """
+    parts = arcname.split("/")
+    return any("/".join(parts[:depth]) in deleted for depth in range(1, len(parts) + 1))
+
+
+class BuildMetrics:
+    """
+    构建过程的分阶段耗时与字节统计
+
+    流式解析时各阶段交替进行，耗时按阶段累加；逐条目计时使用 add() 以减少开销
+    """
+
+    def __init__(self, input_size: int = 0):
+        self.timings = dict.fromkeys(METRIC_PHASES, 0.0)
+        self.input_size = input_size
+        self.uncompressed_bytes = 0
+        self.compressed_bytes = 0
+
+    def __repr__(self) -> str:
+        return f"BuildMetrics({self.to_dict()})"
+
+    def add(self, phase: str, start: float) -> float:
+        """
+        将 start 至今的耗时计入阶段，返回当前时间，便于连续计时
+        """
+        now = time.perf_counter()
+        self.timings[phase] += now - start
+        return now
+
+    @contextmanager
+    def phase(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, start)
+
+    def to_dict(self) -> dict:
+        return {
+            "phases_ms": {phase: round(seconds * 1000, 3) for phase, seconds in self.timings.items()},
+            "total_ms": round(sum(self.timings.values()) * 1000, 3),
+            "input_size": self.input_size,
+            "uncompressed_bytes": self.uncompressed_bytes,
+            "compressed_bytes": self.compressed_bytes,
+            "ratio": round(self.compressed_bytes / self.uncompressed_bytes, 4) if self.uncompressed_bytes else None,
+        }
+
+
+# 分阶段统计的回调，每次调用工具输出压缩包后依次调用，可用于转发到外部监控
+PROFILING_HOOKS: list[Callable[[dict], None]] = []
+
+
+def register_profiling_hook(hook: Callable[[dict], None]) -> None:
+    """
+    注册分阶段统计回调，回调参数为 BuildMetrics.to_dict() 的结果
+    """
+    PROFILING_HOOKS.append(hook)
+
+
+def unregister_profiling_hook(hook: Callable[[dict], None]) -> None:
+    if hook in PROFILING_HOOKS:
+        PROFILING_HOOKS.remove(hook)
+
+
+def _report_metrics(metrics_info: dict) -> None:
+    """
+    调用所有统计回调，回调出错不影响工具输出
+    """
+    for hook in list(PROFILING_HOOKS):
+        try:
+            hook(metrics_info)
+        except Exception:
+            logging.getLogger(__name__).exception("Profiling hook failed")
+
+
+class ArchiveSummary:
+    """
+    压缩包内容摘要：写入器写入条目时顺带统计文件数、目录数与字节数，
+    并按目录汇总出限定层数的目录树，不需要再遍历一次清单
+    """
+
+    def __init__(self, depth: int = SUMMARY_TREE_DEPTH, max_lines: int = SUMMARY_TREE_LINES):
+        self.depth = depth
+        self.max_lines = max_lines
+        self.file_count = 0
+        self.directory_count = 0
+        self.total_bytes = 0
+        # 目录树节点：路径 -> [文件数, 字节数]，目录以 / 结尾；
+        # 超过 depth 层的条目只计入上级目录，超过 max_lines 个的文件节点只计数不保存
+        self.nodes: dict[str, list[int]] = {}
+        self.file_nodes = 0
+        self.omitted = 0
+        self._parents: dict[str, list] = {}
+
+    def __repr__(self) -> str:
+        return f"ArchiveSummary(files={self.file_count}, directories={self.directory_count}, bytes={self.total_bytes})"
+
+    def add_file(self, arcname: str, size: int) -> None:
+        self.file_count += 1
+        self.total_bytes += size
+        # 按所在目录缓存需要累加的上级节点，同一目录下的文件不再重复拆分路径
+        dirname = arcname[:arcname.rfind("/") + 1]
+        parents = self._parents.get(dirname)
+        if parents is None:
+            parents = self._parents[dirname] = []
+            end = -1
+            for _ in range(self.depth):
+                end = dirname.find("/", end + 1)
+                if end < 0:
+                    break
+                parents.append(self.nodes.setdefault(dirname[:end + 1], [0, 0]))
+        for node in parents:
+            node[0] += 1
+            node[1] += size
+        if len(parents) < self.depth:
+            if self.file_nodes < self.max_lines:
+                self.nodes[arcname] = [1, size]
+                self.file_nodes += 1
+            else:
+                self.omitted += 1
+
+    def add_directory(self, arcname: str) -> None:
+        self.directory_count += 1
+        if arcname.count("/") <= self.depth:
+            self.nodes.setdefault(arcname, [0, 0])
+
+    def tree(self) -> list[str]:
+        """
+        按路径排序输出目录树，每行一个节点，超出 max_lines 的部分合并为最后一行
+        """
+        names = sorted(self.nodes, key=lambda name: name.rstrip("/").split("/"))
+        lines = []
+        for name in names[:self.max_lines]:
+            files, size = self.nodes[name]
+            parts = name.rstrip("/").split("/")
+            indent = "  " * (len(parts) - 1)
+            if name.endswith("/"):
+                lines.append(f"{indent}{parts[-1]}/ ({files} files, {size} bytes)")
+            else:
+                lines.append(f"{indent}{parts[-1]} ({size} bytes)")
+        remaining = max(len(names) - self.max_lines, 0) + self.omitted
+        if remaining:
+            lines.append(f"... {remaining} more entries")
+        return lines
+
+    def to_dict(self) -> dict:
+        return {
+            "total_files": self.file_count,
+            "total_directories": self.directory_count,
+            "uncompressed_bytes": self.total_bytes,
+            "tree": self.tree(),
+        }
+
+
+def summarize_result(result: dict, detail: str = "summary") -> dict:
+    """
+    把构建结果整理为可 JSON 序列化的摘要；detail 为 full 时附带完整的结果信息（包括文件列表）
+    """
+    info = result["result"]
+    summary = {"name": result["name"]} if "name" in result else {}
+    summary.update({
+        "filename": result["file"]["filename"],
+        "mime_type": result["file"]["mime_type"],
+        **result["summary"].to_dict(),
+        "compressed_bytes": result["metrics"].compressed_bytes,
+    })
+    # 增量模式的变更统计与批量合并模式的各结构结果
+    for key in ("added", "modified", "deleted"):
+        if key in info:
+            summary[key] = len(info[key])
+    for key in ("unchanged", "items"):
+        if key in info:
+            summary[key] = info[key]
+    summary["duplicates"] = len(info.get("duplicates") or [])
+    # 压缩缓存的命中统计（tar 格式不使用缓存）
+    if info.get("compression_cache") is not None:
+        summary["compression_cache"] = info["compression_cache"]
+    summary["timestamp"] = info["timestamp"]
+    if detail == "full":
+        summary["result"] = info
+    return summary
+
+
+class ArchiveOutput:
+    """
+    压缩包输出缓冲：较小的压缩包保存在内存中，超过 SPOOL_MAX_MEMORY 后转存到临时文件
+    """
+
+    def __init__(self, max_memory: int = SPOOL_MAX_MEMORY):
+        self.max_memory = max_memory
+        self.file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+
+    def __repr__(self) -> str:
+        return f"ArchiveOutput(size={self.size}, spilled={self.spilled})"
+
+    @property
+    def size(self) -> int:
+        return self.file.seek(0, io.SEEK_END)
+
+    @property
+    def spilled(self) -> bool:
+        """
+        是否已转存到临时文件：SpooledTemporaryFile 在写入位置超过 max_size 时转存，写入器只会顺序写入或回写已写过的位置，
+        因此按当前大小判断即可，不依赖其私有属性
+        """
+        return self.size > self.max_memory
+
+    def getvalue(self) -> bytes:
+        """
+        读取完整的压缩包数据
+        """
+        self.file.seek(0)
+        return self.file.read()
+
+    def iter_chunks(self, chunk_size: int) -> Generator[bytes, None, None]:
+        """
+        按块读取压缩包数据
+        """
+        self.file.seek(0)
+        while chunk := self.file.read(chunk_size):
+            yield chunk
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _normalize_arcname(file_path: str) -> str:
+    """
+    将输入路径规范化为压缩包内的相对路径，效果等同于旧流程中的 os.path.relpath
+    """
+    arcname = posixpath.normpath(file_path).lstrip("/")
+    if arcname in ("", ".") or arcname == ".." or arcname.startswith("../"):
+        raise ValueError(f"Invalid file path: {file_path!r}")
+    return arcname
+
+
+class FileManifest:
+    """
+    文件清单：把 files 与 file_structure 两个数组归一化为以压缩包路径为键的有序索引
+
+    目录以 "dir/" 形式作为键，值为 None；文件的值为其内容，只在 file_structure 中出现的文件内容为 None（创建空文件）
+    """
+
+    def __init__(self):
+        self.entries: dict[str, str | None] = {}
+        self.duplicates: list[str] = []
+        self.file_count = 0
+
+    @classmethod
+    def from_structure(cls, structure: dict) -> "FileManifest":
+        """
+        一次遍历解析 files 与 file_structure
+
+        Args:
+            structure: json.loads 后的结构对象
+
+        Returns:
+            FileManifest: 文件清单
+        """
+        manifest = cls()
+        for item in structure.get("files") or []:
+            manifest.add_file(item["filename"], _file_content(item))
+        for file_path in structure.get("file_structure") or []:
+            manifest.add_path(file_path)
+        return manifest
+
+    def add_file(self, file_path: str, content: str | None = None) -> list[str]:
+        """
+        登记一个文件，重复出现时保留第一次的内容
+
+        Returns:
+            list[str]: 本次新登记的条目（包括新出现的父目录），重复时为空列表
+        """
+        if content is not None and not isinstance(content, str):
+            raise ValueError(f"Content of {file_path!r} must be a string")
+        arcname = _normalize_arcname(file_path)
+
+        if arcname in self.entries:
+            # file_structure 中先出现、files 中后给出内容的情况
+            if self.entries[arcname] is None and content is not None:
+                self.entries[arcname] = content
+            elif content is not None:
+                self.duplicates.append(arcname)
+            return []
+        if arcname + "/" in self.entries:
+            raise ValueError(f"Path {arcname!r} is both a file and a directory")
+
+        added = self._add_parents(arcname)
+        self.entries[arcname] = content
+        self.file_count += 1
+        added.append(arcname)
+        return added
+
+    def add_directory(self, dir_path: str) -> list[str]:
+        """
+        登记一个目录（file_structure 中以 / 结尾的路径）
+
+        Returns:
+            list[str]: 本次新登记的目录条目
+        """
+        arcname = _normalize_arcname(dir_path)
+        if arcname in self.entries:
+            raise ValueError(f"Path {arcname!r} is both a file and a directory")
+        added = self._add_parents(arcname)
+        if arcname + "/" not in self.entries:
+            self.entries[arcname + "/"] = None
+            added.append(arcname + "/")
+        return added
+
+    def add_path(self, file_path: str) -> list[str]:
+        """
+        登记 file_structure 中的一个路径，以 / 结尾的视为目录
+        """
+        if file_path.endswith("/"):
+            return self.add_directory(file_path)
+        return self.add_file(file_path)
+
+    def release(self, arcname: str) -> None:
+        """
+        文件写入压缩包后释放其内容，只保留索引
+        """
+        self.entries[arcname] = ""
+
+    def iter_files(self):
+        """
+        按登记顺序返回所有文件路径
+        """
+        return (name for name in self.entries if not name.endswith("/"))
+
+    def _add_parents(self, arcname: str) -> list[str]:
+        added = []
+        parts = arcname.split("/")
+        for depth in range(1, len(parts)):
+            dirname = "/".join(parts[:depth])
+            if dirname in self.entries:
+                raise ValueError(f"Path {dirname!r} is both a file and a directory")
+            if dirname + "/" not in self.entries:
+                self.entries[dirname + "/"] = None
+                added.append(dirname + "/")
+        return added
+
+
+def _file_content(item: dict) -> str:
+    """
+    files 中条目的内容，显式给出的 null 视为空文件
+
+    None 只用于表示仅在 file_structure 中出现的文件，否则重复的文件在流式解析时（先出现的已写入压缩包）
+    与非流式解析时会得到不同的内容
+    """
+    content = item.get("content", "")
+    return "" if content is None else content
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+def _skip_whitespace(text: str, idx: int) -> int:
+    return _WHITESPACE.match(text, idx).end()
+
+
+def _expect(text: str, idx: int, chars: str) -> str:
+    """
+    校验当前位置的字符，返回该字符
+    """
+    if idx >= len(text) or text[idx] not in chars:
+        raise json.JSONDecodeError(f"Expecting one of {chars!r}", text, idx)
+    return text[idx]
+
+
+def _iter_structure(structure: str) -> Generator[tuple[str, Any], None, None]:
+    """
+    增量解析结构字符串，不构建完整的 JSON 对象
+
+    Args:
+        structure: 结构字符串
+
+    Yields:
+        tuple: (顶层键, 值)，键为 files 时逐个产出数组中的文件条目，其余键产出完整的值
+    """
+    idx = _skip_whitespace(structure, 0)
+    _expect(structure, idx, "{")
+    idx = _skip_whitespace(structure, idx + 1)
+    if _expect(structure, idx, '"}') == "}":
+        idx += 1
+    else:
+        while True:
+            _expect(structure, idx, '"')
+            key, idx = _DECODER.raw_decode(structure, idx)
+            idx = _skip_whitespace(structure, idx)
+            _expect(structure, idx, ":")
+            idx = _skip_whitespace(structure, idx + 1)
+
+            if key == "files" and structure.startswith("[", idx):
+                idx = _skip_whitespace(structure, idx + 1)
+                if _expect(structure, idx, "]{") == "{":
+                    while True:
+                        item, idx = _DECODER.raw_decode(structure, idx)
+                        yield key, item
+                        # 条目交给调用方后立即释放引用
+                        item = None
+                        idx = _skip_whitespace(structure, idx)
+                        if _expect(structure, idx, ",]") == "]":
+                            break
+                        idx = _skip_whitespace(structure, idx + 1)
+                idx += 1
+            else:
+                value, idx = _DECODER.raw_decode(structure, idx)
+                yield key, value
+
+            idx = _skip_whitespace(structure, idx)
+            if _expect(structure, idx, ",}") == "}":
+                idx += 1
+                break
+            idx = _skip_whitespace(structure, idx + 1)
+
+    idx = _skip_whitespace(structure, idx)
+    if idx != len(structure):
+        raise json.JSONDecodeError("Extra data", structure, idx)
+
+
+def _iter_array(text: str) -> Generator[tuple[Any, int], None, None]:
+    """
+    增量解析顶层 JSON 数组，逐个产出元素，不构建完整的数组
+
+    Yields:
+        tuple: (元素, 元素在输入中的长度)
+    """
+    idx = _skip_whitespace(text, 0)
+    _expect(text, idx, "[")
+    idx = _skip_whitespace(text, idx + 1)
+    if text.startswith("]", idx):
+        idx += 1
+    else:
+        while True:
+            item, end = _DECODER.raw_decode(text, idx)
+            yield item, end - idx
+            item = None
+            idx = _skip_whitespace(text, end)
+            if _expect(text, idx, ",]") == "]":
+                idx += 1
+                break
+            idx = _skip_whitespace(text, idx + 1)
+
+    idx = _skip_whitespace(text, idx)
+    if idx != len(text):
+        raise json.JSONDecodeError("Extra data", text, idx)
+
+
+def _create_executor(workers: int) -> ThreadPoolExecutor:
+    """
+    创建压缩线程池
+
+    dify_plugin 导入时会对 threading 做 gevent monkey patch，此时标准线程池中的线程只是协程，
+    无法利用多核，需要改用 gevent 提供的原生线程池
+    """
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched("threading"):
+            from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+            return NativeThreadPoolExecutor(max_workers=workers)
+    except ImportError:
+        pass
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def _native_lock():
+    """
+    创建原生线程锁：缓存会被 gevent 原生线程池中的线程访问，不能使用被 patch 的协程锁
+    """
+    try:
+        from gevent import monkey
+        return monkey.get_original("_thread", "allocate_lock")()
+    except ImportError:
+        return threading.Lock()
+
+
+class CompressionCache:
+    """
+    压缩结果的 LRU 缓存：以内容哈希加压缩参数为键，保存 CRC、条目数据与压缩方式
+
+    插件进程常驻，同一结构反复生成时未改动的文件可以直接复用压缩结果
+    """
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[int, bytes, int]] = OrderedDict()
+        self._size = 0
+        self._lock = _native_lock()
+
+    @staticmethod
+    def make_key(data: bytes, *settings) -> tuple:
+        return (hashlib.sha256(data).digest(), *settings)
+
+    def get(self, key: tuple) -> tuple[int, bytes, int] | None:
+        """
+        查找缓存，命中时返回 (CRC32, 条目数据, 压缩方式)
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value: tuple[int, bytes, int]) -> None:
+        """
+        写入缓存，超出容量时按最近最少使用淘汰
+        """
+        size = len(value[1]) + CACHE_ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = value
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[1]) + CACHE_ENTRY_OVERHEAD
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "total_hits": self.hits,
+            "total_misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# 进程内共享的压缩结果缓存
+COMPRESSION_CACHE = CompressionCache()
+
+
+def _compress_entry(data: bytes, level: int = zlib.Z_DEFAULT_COMPRESSION) -> tuple[int, bytes, int]:
+    """
+    计算 CRC32 并按压缩策略生成条目数据，zlib 在计算与压缩时都会释放 GIL
+
+    很小的文件或试压缩样本后几乎无法压缩的内容直接存储，省去 deflate 的开销
+
+    Returns:
+        tuple: (CRC32, 条目数据, 压缩方式 ZIP_DEFLATED/ZIP_STORED)
+    """
+    crc = zlib.crc32(data)
+    if len(data) <= STORE_MAX_SIZE:
+        return crc, data, zipfile.ZIP_STORED
+    if len(data) > TRIAL_SAMPLE_SIZE * 4:
+        sample = data[:TRIAL_SAMPLE_SIZE]
+        if len(zlib.compress(sample, 1)) > len(sample) * TRIAL_MIN_RATIO:
+            return crc, data, zipfile.ZIP_STORED
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    payload = compressor.compress(data) + compressor.flush()
+    if len(payload) >= len(data):
+        return crc, data, zipfile.ZIP_STORED
+    return crc, payload, zipfile.ZIP_DEFLATED
+
+
+def _write_precompressed(zip_file: zipfile.ZipFile, zinfo: zipfile.ZipInfo, crc: int, payload: bytes, file_size: int) -> None:
+    """
+    把已经压缩好的数据直接写入压缩包，等同于 ZipFile.writestr 但跳过压缩步骤，压缩方式取 zinfo.compress_type
+
+    依赖 ZipFile 的内部实现（fp、start_dir、_writecheck、_didModify、filelist、NameToInfo），
+    已在 CPython 3.10、3.11、3.12（插件运行环境）、3.13 上验证；升级 Python 版本时需要重新确认
+    """
+    zinfo.CRC = crc
+    zinfo.compress_size = len(payload)
+    zinfo.file_size = file_size
+
+    fp = zip_file.fp
+    fp.seek(zip_file.start_dir)
+    zinfo.header_offset = fp.tell()
+    zip_file._writecheck(zinfo)
+    zip_file._didModify = True
+    fp.write(zinfo.FileHeader())
+    fp.write(payload)
+    zip_file.filelist.append(zinfo)
+    zip_file.NameToInfo[zinfo.filename] = zinfo
+    zip_file.start_dir = fp.tell()
+
+
+def _read_raw_entry(zip_file: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    """
+    读取条目原始的压缩数据，不解压
+
+    使用 ZipFile.fp 与模块内未公开的 sizeFileHeader / stringFileHeader，验证范围同 _write_precompressed
+    """
+    if info.flag_bits & 0x1:
+        raise ValueError(f"Encrypted entry {info.filename!r} is not supported")
+    fp = zip_file.fp
+    fp.seek(info.header_offset)
+    header = fp.read(zipfile.sizeFileHeader)
+    if header[:4] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad local file header for {info.filename!r}")
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    fp.seek(info.header_offset + zipfile.sizeFileHeader + name_length + extra_length)
+    return fp.read(info.compress_size)
+
+
+class ZipArchiveWriter:
+    """
+    zip 压缩包写入器：按清单顺序写入条目
+
+    workers 大于 1 时在线程池中并行计算 CRC 与压缩，结果仍按提交顺序写入，保证压缩包内容确定；
+    传入 cache 时内容相同的文件直接复用缓存中的压缩结果
+    """
+
+    def __init__(
+        self,
+        fileobj,
+        workers: int = 1,
+        cache: CompressionCache | None = None,
+        level: int = zlib.Z_DEFAULT_COMPRESSION,
+        metrics: BuildMetrics | None = None,
+    ):
+        self.zip_file = zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED)
+        self.metrics = metrics or BuildMetrics()
+        self.summary = ArchiveSummary()
+        self.date_time = datetime.now().timetuple()[:6]
+        self.level = level
+        self.cache = cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._executor = _create_executor(workers) if workers > 1 else None
+        self._max_pending = workers * 4
+        self._pending = deque()
+        self._pending_bytes = 0
+
+    def __enter__(self) -> "ZipArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            if self._executor is not None:
+                # gevent 原生线程池的 shutdown 不支持 wait / cancel_futures，会直接结束线程池；
+                # 先取消尚未开始的压缩任务（gevent 的任务无法取消），再等待其余任务结束
+                jobs = [job for _, job, _, _ in self._pending if job is not None and not isinstance(job, tuple)]
+                self._pending.clear()
+                for job in jobs:
+                    if not job.cancel():
+                        job.exception()
+                self._executor.shutdown(wait=True)
+            self.zip_file.close()
+
+    def write_entries(self, manifest: "FileManifest", names: list) -> list:
+        """
+        将清单中的条目写入压缩包，写入（或提交压缩）后释放文件内容
+
+        Returns:
+            list: 本次写入的文件路径
+        """
+        written = []
+        for arcname in names:
+            start = time.perf_counter()
+            if arcname.endswith("/"):
+                dir_info = zipfile.ZipInfo(arcname, self.date_time)
+                dir_info.external_attr = ZIP_DIR_ATTR
+                self._submit(dir_info, b"")
+                self.summary.add_directory(arcname)
+                self.metrics.add("compress", start)
+                continue
+
+            # 没有内容时写入空文件
+            content = manifest.entries[arcname]
+            data = content.encode('utf-8') if content else b""
+            content = None
+            manifest.release(arcname)
+            start = self.metrics.add("materialize", start)
+            self.metrics.uncompressed_bytes += len(data)
+
+            file_info = zipfile.ZipInfo(arcname, self.date_time)
+            file_info.external_attr = ZIP_FILE_ATTR
+            file_info.compress_type = zipfile.ZIP_DEFLATED
+            self._submit(file_info, data)
+            self.summary.add_file(arcname, len(data))
+            self.metrics.add("compress", start)
+            written.append(arcname)
+        return written
+
+    def copy_entry(self, source: zipfile.ZipFile, info: zipfile.ZipInfo, arcname: str | None = None) -> None:
+        """
+        从另一个zip中原样复制条目，压缩数据不解压也不重新压缩
+        """
+        zinfo = zipfile.ZipInfo(arcname or info.filename, info.date_time)
+        zinfo.external_attr = info.external_attr
+        if info.is_dir():
+            self._enqueue(zinfo, None, 0, None)
+            self.summary.add_directory(zinfo.filename)
+            return
+        if info.compress_type == zipfile.ZIP_LZMA:
+            # LZMA 数据包含结束标记，需要保留对应的标志位
+            zinfo.flag_bits |= 0x02
+        start = time.perf_counter()
+        job = (info.CRC, _read_raw_entry(source, info), info.compress_type)
+        start = self.metrics.add("materialize", start)
+        self.metrics.uncompressed_bytes += info.file_size
+        self._enqueue(zinfo, job, info.file_size, None)
+        self.summary.add_file(zinfo.filename, info.file_size)
+        self.metrics.add("compress", start)
+
+    def close(self) -> None:
+        """
+        写入所有等待中的条目并关闭压缩包
+        """
+        start = time.perf_counter()
+        while self._pending:
+            self._write_next()
+        start = self.metrics.add("compress", start)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.zip_file.close()
+        self.metrics.add("finalize", start)
+
+    def _submit(self, zinfo: zipfile.ZipInfo, data: bytes) -> None:
+        if zinfo.is_dir():
+            # 目录条目不需要压缩，但也要排队以保持顺序
+            job, key = None, None
+        else:
+            job, key = self._lookup(data)
+            if job is None:
+                job = self._executor.submit(_compress_entry, data, self.level) if self._executor else _compress_entry(data, self.level)
+        self._enqueue(zinfo, job, len(data), key)
+
+    def _enqueue(self, zinfo: zipfile.ZipInfo, job, file_size: int, key: tuple | None) -> None:
+        if self._executor is None:
+            self._write(zinfo, job, file_size, key)
+            return
+
+        self._pending.append((zinfo, job, file_size, key))
+        self._pending_bytes += file_size
+        while len(self._pending) > self._max_pending or self._pending_bytes > PARALLEL_WINDOW_BYTES:
+            self._write_next()
+
+    def _lookup(self, data: bytes) -> tuple[tuple[int, bytes, int] | None, tuple | None]:
+        """
+        查找压缩缓存
+
+        Returns:
+            tuple: (命中的压缩结果, 未命中时用于写回缓存的键)
+        """
+        if self.cache is None or not data:
+            return None, None
+        key = self.cache.make_key(data, self.level)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached, None
+        self.cache_misses += 1
+        return None, key
+
+    def _write_next(self) -> None:
+        zinfo, job, file_size, key = self._pending.popleft()
+        self._pending_bytes -= file_size
+        self._write(zinfo, job, file_size, key)
+
+    def _write(self, zinfo: zipfile.ZipInfo, job, file_size: int, key: tuple | None) -> None:
+        if job is None:
+            self.zip_file.writestr(zinfo, b"")
+            return
+        crc, payload, compress_type = job if isinstance(job, tuple) else job.result()
+        if key is not None:
+            self.cache.put(key, (crc, payload, compress_type))
+        zinfo.compress_type = compress_type
+        _write_precompressed(self.zip_file, zinfo, crc, payload, file_size)
+
+
+class TarArchiveWriter:
+    """
+    tar 压缩包写入器：以流模式写入，可选 gzip / xz 整体压缩
+
+    与 ZipArchiveWriter 接口一致；tar 的压缩作用于整个数据流，不使用并行压缩和压缩缓存
+    """
+
+    cache = None
+    cache_hits = 0
+    cache_misses = 0
+
+    def __init__(self, fileobj, compression: str | None = None, level: str = "balanced", metrics: BuildMetrics | None = None):
+        self.metrics = metrics or BuildMetrics()
+        self.summary = ArchiveSummary()
+        self.mtime = int(datetime.now().timestamp())
+        if compression == "gz":
+            self._stream = gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=COMPRESSION_LEVELS[level], mtime=self.mtime)
+        elif compression == "xz":
+            self._stream = lzma.LZMAFile(fileobj, "wb", preset=XZ_PRESETS[level])
+        else:
+            self._stream = None
+        self.tar_file = tarfile.open(fileobj=self._stream or fileobj, mode="w|", format=tarfile.PAX_FORMAT)
+
+    def __enter__(self) -> "TarArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def write_entries(self, manifest: "FileManifest", names: list) -> list:
+        """
+        将清单中的条目写入压缩包，写入后释放文件内容
+
+        Returns:
+            list: 本次写入的文件路径
+        """
+        written = []
+        for arcname in names:
+            start = time.perf_counter()
+            tar_info = tarfile.TarInfo(arcname.rstrip("/"))
+            tar_info.mtime = self.mtime
+            if arcname.endswith("/"):
+                tar_info.type = tarfile.DIRTYPE
+                tar_info.mode = 0o755
+                self.tar_file.addfile(tar_info)
+                self.summary.add_directory(arcname)
+                self.metrics.add("compress", start)
+                continue
+
+            content = manifest.entries[arcname]
+            data = content.encode('utf-8') if content else b""
+            content = None
+            manifest.release(arcname)
+            start = self.metrics.add("materialize", start)
+            self.metrics.uncompressed_bytes += len(data)
+
+            tar_info.mode = 0o644
+            tar_info.size = len(data)
+            self.tar_file.addfile(tar_info, io.BytesIO(data))
+            self.summary.add_file(arcname, tar_info.size)
+            self.metrics.add("compress", start)
+            written.append(arcname)
+        return written
+
+    def close(self) -> None:
+        with self.metrics.phase("finalize"):
+            self.tar_file.close()
+            if self._stream is not None:
+                self._stream.close()
+
+
+def _create_writer(
+    fileobj,
+    archive_format: str,
+    compression: str,
+    workers: int,
+    cache: CompressionCache | None,
+    metrics: BuildMetrics | None = None,
+):
+    """
+    按压缩包格式创建写入器
+    """
+    if archive_format == "zip":
+        return ZipArchiveWriter(fileobj, workers, cache, COMPRESSION_LEVELS[compression], metrics)
+    return TarArchiveWriter(fileobj, archive_format.partition(".")[2] or None, compression, metrics)
+
+
+def _write_streaming(
+    writer: "ZipArchiveWriter | TarArchiveWriter",
+    structure: str,
+    collect_files: bool = True,
+) -> tuple[FileManifest, list]:
+    """
+    流式解析 files 数组，每个条目的内容完整后立即写入压缩包并释放
+
+    file_structure 只包含路径，先暂存，待 files 全部写入后再补充其中缺失的空文件和目录
+
+    Args:
+        writer: 压缩包写入器
+        structure: 结构字符串
+        collect_files: 是否收集压缩包内的文件路径列表，不需要时返回空列表
+
+    Returns:
+        tuple: (文件清单, 压缩包内的文件路径列表)
+    """
+    metrics = writer.metrics
+    manifest = FileManifest()
+    file_structure = []
+    created_files = []
+
+    start = time.perf_counter()
+    for key, value in _iter_structure(structure):
+        start = metrics.add("parse", start)
+        if key == "files" and value is not None:
+            added = manifest.add_file(value["filename"], _file_content(value))
+            value = None
+            metrics.add("manifest", start)
+            written = writer.write_entries(manifest, added)
+            if collect_files:
+                created_files.extend(written)
+        elif key == "file_structure":
+            file_structure = value or []
+        start = time.perf_counter()
+
+    for file_path in file_structure:
+        start = time.perf_counter()
+        added = manifest.add_path(file_path)
+        metrics.add("manifest", start)
+        written = writer.write_entries(manifest, added)
+        if collect_files:
+            created_files.extend(written)
+
+    return manifest, created_files
+
+
+def _build_zip_via_temp_dir(
+    manifest: FileManifest,
+    fileobj,
+    metrics: BuildMetrics | None = None,
+    summary: ArchiveSummary | None = None,
+) -> list:
+    """
+    旧流程：先写入临时目录，再遍历目录打包
+    
+    Args:
+        manifest: 文件清单
+        fileobj: 写入zip数据的文件对象
+        metrics: 分阶段统计
+        summary: 内容摘要，在写入临时目录时统计
+        
+    Returns:
+        list: 临时目录中的文件路径列表
+    """
+    metrics = metrics or BuildMetrics()
+    summary = summary or ArchiveSummary()
+
+    # 创建临时目录
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        start = time.perf_counter()
+        
+        # 创建目录结构
+        created_files = []
+        for arcname, content in manifest.entries.items():
+            full_path = temp_path / arcname
+            if arcname.endswith("/"):
+                full_path.mkdir(parents=True, exist_ok=True)
+                summary.add_directory(arcname)
+                continue
+            
+            # 创建父目录
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # 写入文件内容
+            if content is not None:
+                full_path.write_text(content, encoding='utf-8')
+                size = full_path.stat().st_size
+                metrics.uncompressed_bytes += size
+                summary.add_file(arcname, size)
+                created_files.append(str(full_path))
+            else:
+                # 如果没有内容，创建空文件
+                full_path.touch()
+                summary.add_file(arcname, 0)
+                created_files.append(str(full_path))
+        
+        start = metrics.add("materialize", start)
+
+        # 创建zip文件
+        with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for root, dirs, files in os.walk(temp_dir):
+                for file in files:
+                    file_path = os.path.join(root, file)
+                    arcname = os.path.relpath(file_path, temp_dir)
+                    zip_file.write(file_path, arcname)
+        metrics.add("compress", start)
+        
+        return created_files